@@ -6,7 +6,7 @@ import winreg
 import os
 import sys
 from auth import LastFMAuthenticator
-from tracker import MediaTracker
+from tracker import MediaTracker, ALLOWED_APPS, BROWSER_APPS
 from ui import AppUI
 from concurrent.futures import ThreadPoolExecutor
 
@@ -22,6 +22,17 @@ load_dotenv(dotenv_path=env_path)
 
 API_KEY = os.environ.get("LASTFM_API_KEY", "")
 API_SECRET = os.environ.get("LASTFM_API_SECRET", "")
+SCROBBLE_BROWSERS = os.environ.get("SCROBBLE_BROWSERS", "").lower() in ("1", "true", "yes")
+
+class ScrobbleSession:
+    """Scrobble state machine for a single media session."""
+    def __init__(self):
+        self.current_scrobble_track = None
+        self.pending_scrobble = None
+        self.ready_to_submit = False
+        self.last_pos = 0
+        self.last_now_playing_ping = 0
+        self.last_update = None
 
 class MainApp:
     def __init__(self):
@@ -31,15 +42,13 @@ class MainApp:
         self.auth = LastFMAuthenticator(API_KEY, API_SECRET)
         self.ui = AppUI(self.auth, self.start_tracker_thread)
         
-        self.tracker = MediaTracker(callback_func=self.on_track_change)
+        allowed_apps = ALLOWED_APPS + BROWSER_APPS if SCROBBLE_BROWSERS else ALLOWED_APPS
+        self.tracker = MediaTracker(callback_func=self.on_track_change, allowed_apps=allowed_apps)
         
-        self.current_scrobble_track = None
-        self.pending_scrobble = None
-        self.ready_to_submit = False
+        self.scrobble_sessions = {}
+        self.display_session = None
         self.ui.after(0, lambda: self.ui.progress.set(0))
         self.last_state = None
-        self.last_pos = 0
-        self.last_now_playing_ping = 0
         self.ui.startup_callback = self.update_startup_registry
         self.auth.get_cached_session() 
         
@@ -71,77 +80,118 @@ class MainApp:
         asyncio.set_event_loop(loop)
         loop.run_until_complete(self.tracker.run_loop())
 
-    def on_track_change(self, artist, track, album, is_playing, duration, current_pos, thumbnail):
+    def on_track_change(self, session_id, artist, track, album, is_playing, duration, current_pos, thumbnail):
         """
-        Main heartbeat triggered by tracker.py every ~1 second.
+        Main heartbeat triggered by tracker.py whenever a session changes.
         """
-        if duration > 0:
+        if track is None:
+            self.close_session(session_id)
+            return
+
+        session = self.scrobble_sessions.get(session_id)
+        if session is None:
+            session = self.scrobble_sessions[session_id] = ScrobbleSession()
+        session.last_update = (artist, track, album, is_playing, duration, current_pos, thumbnail)
+        is_display = self.claim_display(session_id, is_playing)
+
+        if is_display and duration > 0:
             prog = min(1.0, current_pos / duration)
             self.ui.after(0, lambda p=prog: self.ui.progress.set(p))
 
-        if self.pending_scrobble and track == self.pending_scrobble['track']:
-            if current_pos < (self.last_pos - 10):
-                if self.ready_to_submit:
-                    self.submit_final_scrobble(self.pending_scrobble)
+        if session.pending_scrobble and track == session.pending_scrobble['track']:
+            if current_pos < (session.last_pos - 10):
+                if session.ready_to_submit:
+                    self.submit_final_scrobble(session.pending_scrobble)
                 
-                self.pending_scrobble['timestamp'] = int(time.time())
-                self.ready_to_submit = False
+                session.pending_scrobble['timestamp'] = int(time.time())
+                session.ready_to_submit = False
 
                 if self.auth.session_key and track:
                     self.executor.submit(self.safe_now_playing, artist, track, album)
         
-        self.last_pos = current_pos
+        session.last_pos = current_pos
 
-        if track is None:
-            self.ui.after(0, lambda: self.ui.update_track_info(None, None, None, False, None))
-            self.last_state = False
-            self.current_scrobble_track = None
-            return
+        if is_display:
+            if track != session.current_scrobble_track or is_playing != self.last_state:
+                self.ui.after(0, lambda: self.ui.update_track_info(artist, track, album, is_playing, thumbnail))
+                self.last_state = is_playing
 
-        if track != self.current_scrobble_track or is_playing != self.last_state:
-            self.ui.after(0, lambda: self.ui.update_track_info(artist, track, album, is_playing, thumbnail))
-            self.last_state = is_playing
-
-        if track:
             self.ui.update_tray_tooltip(f"{track} - {artist}")
-        else:
-            self.ui.update_tray_tooltip("Apple Music Scrobbler")
 
-        self.handle_scrobble_logic(artist, track, album, is_playing, duration, current_pos)
+        self.handle_scrobble_logic(session, artist, track, album, is_playing, duration, current_pos, is_display)
+
+    def claim_display(self, session_id, is_playing):
+        """Hands the UI to this session if nothing is shown or the shown session stopped playing."""
+        if session_id != self.display_session:
+            if self.display_session not in self.scrobble_sessions or (is_playing and not self.last_state):
+                self.display_session = session_id
+                self.last_state = None
+        return session_id == self.display_session
+
+    def close_session(self, session_id):
+        """Flushes a qualified scrobble and clears the UI when a session disappears."""
+        session = self.scrobble_sessions.pop(session_id, None)
+        if session and session.pending_scrobble and session.ready_to_submit:
+            self.submit_final_scrobble(session.pending_scrobble)
+
+        if session_id == self.display_session:
+            self.display_session = None
+            self.hand_off_display()
+
+    def hand_off_display(self):
+        """Shows the next open session, preferring one that is playing, or clears the UI."""
+        candidates = [(sid, s) for sid, s in self.scrobble_sessions.items() if s.last_update]
+        if not candidates:
+            self.ui.after(0, lambda: self.ui.update_track_info(None, None, None, False, None))
+            self.ui.after(0, lambda: self.ui.progress.set(0))
+            self.ui.update_tray_tooltip("Apple Music Scrobbler")
+            self.last_state = False
+            return
 
-    def handle_scrobble_logic(self, artist, track, album, is_playing, duration, current_pos):
+        self.display_session, session = max(candidates, key=lambda c: self.tracker.is_session_playing(c[0]))
+        artist, track, album, _, duration, current_pos, thumbnail = session.last_update
+        is_playing = self.tracker.is_session_playing(self.display_session)
+        if thumbnail: thumbnail.seek(0)
+        prog = min(1.0, current_pos / duration) if duration > 0 else 0
+        self.ui.after(0, lambda: self.ui.update_track_info(artist, track, album, is_playing, thumbnail))
+        self.ui.after(0, lambda: self.ui.progress.set(prog))
+        self.ui.update_tray_tooltip(f"{track} - {artist}")
+        self.last_state = is_playing
+
+    def handle_scrobble_logic(self, session, artist, track, album, is_playing, duration, current_pos, is_display):
         """Logic based on real system position rather than estimated timers."""
         real_time_now = int(time.time())
 
-        if not self.pending_scrobble or self.pending_scrobble['track'] != track:
-            if self.pending_scrobble and self.ready_to_submit:
-                self.submit_final_scrobble(self.pending_scrobble)
+        if not session.pending_scrobble or session.pending_scrobble['track'] != track:
+            if session.pending_scrobble and session.ready_to_submit:
+                self.submit_final_scrobble(session.pending_scrobble)
 
             print(f"🎵 New Track: {track}")
-            self.pending_scrobble = {
+            session.pending_scrobble = {
                 'artist': artist, 'track': track, 'album': album,
                 'timestamp': real_time_now,
                 'duration': duration
             }
-            self.ready_to_submit = False
-            self.current_scrobble_track = track
-            self.last_now_playing_ping = time.monotonic()
+            session.ready_to_submit = False
+            session.current_scrobble_track = track
+            session.last_now_playing_ping = time.monotonic()
             
             if self.auth.session_key and track:
                 self.executor.submit(self.safe_now_playing, artist, track, album)
 
         target = max(30, min(240, duration / 2)) if duration > 0 else 30
         
-        if not self.ready_to_submit and current_pos >= target:
-            self.ready_to_submit = True
-            self.ui.after(0, lambda: self.ui.scrobble_status.configure(
-                text="● SCROBBLE QUALIFIED", text_color="cyan"
-            ))
-            self.ui.after(5000, self.reset_status_text)
-
-        if is_playing and (time.monotonic() - self.last_now_playing_ping > 120):
+        if not session.ready_to_submit and current_pos >= target:
+            session.ready_to_submit = True
+            if is_display:
+                self.ui.after(0, lambda: self.ui.scrobble_status.configure(
+                    text="● SCROBBLE QUALIFIED", text_color="cyan"
+                ))
+                self.ui.after(5000, self.reset_status_text)
+
+        if is_playing and (time.monotonic() - session.last_now_playing_ping > 120):
             self.executor.submit(self.safe_now_playing, artist, track, album)
-            self.last_now_playing_ping = time.monotonic()
+            session.last_now_playing_ping = time.monotonic()
 
     def reset_status_text(self):
         """Cleanly reverts the UI status text if still playing."""
@@ -1,103 +1,278 @@
 import asyncio
 import io
 import os
+import time
 from winsdk.windows.storage.streams import Buffer, DataReader
 from winsdk.windows.media.control import (
     GlobalSystemMediaTransportControlsSessionManager,
     GlobalSystemMediaTransportControlsSessionPlaybackStatus
 )
 
-class MediaTracker:
-    def __init__(self, callback_func=None):
+# Substrings matched against the lowercased source app ID of each media session:
+# the Apple Music and iTunes desktop apps, and the Apple Music web app when installed as an app.
+ALLOWED_APPS = (
+    "applemusic",
+    "itunes",
+    "music.apple.com",
+)
+
+# Whole browsers. Opt-in only: media from every tab, videos and podcasts included, gets scrobbled.
+# Firefox normally registers under its install hash rather than its name.
+BROWSER_APPS = (
+    "chrome",
+    "msedge",
+    "firefox",
+    "308046b0af4a39cb",
+)
+
+# Consecutive scans a session may be missing from before it is dropped.
+MISSING_TICKS = 3
+
+SESSION_EVENTS = ("media_properties_changed", "timeline_properties_changed", "playback_info_changed")
+
+class SessionState:
+    """Playback state for a single media session."""
+    def __init__(self, session, app_id, key):
+        self.session = None
+        self.app_id = app_id
+        self.key = key
+        self.tokens = []
+        self.dirty = True
+        self.missing = 0
+        self.reported = None
         self.current_track = None
         self.current_artist = None
         self.current_album = None
         self.is_playing = False
         self.last_position = -1
         self.still_count = 0
-        self.callback = callback_func
+        self.elapsed = 0.0
+        self.last_tick = None
         self.cached_thumbnail = None
+        self.bind(session)
+
+    def bind(self, session):
+        """Points this state at a (possibly re-fetched) session object and re-registers its events."""
+        self.unbind()
+        self.session = session
+        self.dirty = True
+
+        def mark_dirty(sender, args):
+            self.dirty = True
+
+        for event in SESSION_EVENTS:
+            try:
+                self.tokens.append((event, getattr(session, f"add_{event}")(mark_dirty)))
+            except:
+                pass
+
+    def unbind(self):
+        for event, token in self.tokens:
+            try:
+                getattr(self.session, f"remove_{event}")(token)
+            except:
+                pass
+        self.tokens = []
+
+class MediaTracker:
+    def __init__(self, callback_func=None, allowed_apps=ALLOWED_APPS):
+        self.callback = callback_func
+        self.allowed_apps = tuple(app.lower() for app in allowed_apps)
+        self.sessions = {}
+        self.session_list = None
+        self.next_id = 0
         self.manager = None
 
+    @property
+    def is_playing(self):
+        return any(state.is_playing and not state.missing for state in self.sessions.values())
+
+    def is_session_playing(self, key):
+        """Live play state of one session; False once it has gone missing."""
+        state = self.sessions.get(key)
+        return bool(state and state.is_playing and not state.missing)
+
+    def is_allowed(self, app_id):
+        return any(app in app_id for app in self.allowed_apps)
+
+    def on_sessions_changed(self, sender, args):
+        self.session_list = None
+
     async def get_media_info(self):
         if not self.manager:
             self.manager = await GlobalSystemMediaTransportControlsSessionManager.request_async()
-        
-        sessions = self.manager.get_sessions()
-        current_session = None
+            self.manager.add_sessions_changed(self.on_sessions_changed)
+
+        # Session objects are only re-fetched when the manager reports a change;
+        # in between, each state holds the exact object it was bound to.
+        session_list = self.session_list
+        if session_list is None:
+            session_list = self.session_list = list(self.manager.get_sessions())
+            await self.rebind_sessions(session_list)
+
+        live = {id(session) for session in session_list}
+        for key, state in list(self.sessions.items()):
+            try:
+                if id(state.session) not in live:
+                    raise LookupError(key)
+                await self.update_session(state)
+                state.missing = 0
+            except:
+                state.missing += 1
+                if state.missing >= MISSING_TICKS:
+                    self.remove_session(key)
+
+    async def rebind_sessions(self, session_list):
+        """Matches a freshly fetched session list to the tracked states.
 
-        for session in sessions:
+        Wrappers returned by the manager are new objects on every fetch, so states
+        are matched by app ID, and by title when one app ID has several sessions.
+        """
+        by_app = {}
+        for session in session_list:
             try:
-                app_id = session.source_app_user_model_id.lower()
-                if "applemusic" in app_id or "itunes" in app_id:
-                    current_session = session
-                    break
+                app_id = session.source_app_user_model_id
             except:
+                # Retry the whole match next tick rather than losing this session.
+                self.session_list = None
                 continue
-        
-        if not current_session:
-            if self.is_playing:
-                self.is_playing = False
-                if self.callback: self.callback(None, None, None, False, 0, 0, None)
-            return
+            if self.is_allowed(app_id.lower()):
+                by_app.setdefault(app_id, []).append(session)
+
+        for app_id, sessions in by_app.items():
+            states = [state for state in self.sessions.values() if state.app_id == app_id]
+            unmatched = []
+            for session in sessions:
+                state = next((state for state in states if state.session is session), None)
+                if state:
+                    states.remove(state)
+                else:
+                    unmatched.append(session)
+
+            if len(states) > 1 and unmatched:
+                for session in list(unmatched):
+                    title = await self.read_title(session)
+                    state = next((state for state in states if title and state.current_track == title), None)
+                    if state:
+                        states.remove(state)
+                        unmatched.remove(session)
+                        state.bind(session)
+
+            for state, session in zip(states, list(unmatched)):
+                unmatched.remove(session)
+                state.bind(session)
 
-        timeline = current_session.get_timeline_properties()
+            for session in unmatched:
+                self.add_session(session, app_id)
+
+    async def read_title(self, session):
+        try:
+            media_properties = await session.try_get_media_properties_async()
+            return media_properties.title if media_properties else None
+        except:
+            return None
+
+    def add_session(self, session, app_id):
+        """Starts tracking a new session under its own key."""
+        state = SessionState(session, app_id, f"{app_id}#{self.next_id}")
+        self.next_id += 1
+        self.sessions[state.key] = state
+        return state
+
+    def remove_session(self, key):
+        state = self.sessions.pop(key)
+        state.unbind()
+        if self.callback: self.callback(key, None, None, None, False, 0, 0, None)
+
+    async def update_session(self, state):
+        """Advances one session; sessions with nothing new return before any async work."""
+        session = state.session
+        timeline = session.get_timeline_properties()
         duration = timeline.end_time.total_seconds()
         current_pos = timeline.position.total_seconds()
+        status = session.get_playback_info().playback_status
+
+        now = time.monotonic()
+        tick = now - state.last_tick if state.last_tick is not None else 0
+        state.last_tick = now
 
-        if current_pos != self.last_position:
-            is_playing_now = True
-            self.still_count = 0 
+        if duration > 0:
+            if current_pos != state.last_position:
+                is_playing_now = True
+                state.still_count = 0
+            else:
+                state.still_count += 1
+                is_playing_now = False if state.still_count > 2 else state.is_playing
+            state.last_position = current_pos
         else:
-            self.still_count += 1
-            is_playing_now = False if self.still_count > 2 else self.is_playing
+            # Players that publish no timeline: trust the reported status and estimate the position.
+            is_playing_now = status == GlobalSystemMediaTransportControlsSessionPlaybackStatus.PLAYING
+            if is_playing_now: state.elapsed += tick
+            current_pos = state.elapsed
+        state.is_playing = is_playing_now
+
+        snapshot = (current_pos, duration, is_playing_now, status)
+        if not state.dirty and snapshot == state.reported:
+            return
+
+        # Stay dirty until a title has been read, so a failed fetch is retried next tick.
+        state.dirty = True
+        media_properties = await session.try_get_media_properties_async()
+        if not media_properties or not media_properties.title:
+            return
 
-        media_properties = await current_session.try_get_media_properties_async()
-        if media_properties and media_properties.title:
-            title = media_properties.title
+        title = media_properties.title
+        if title != state.current_track:
             raw_artist = media_properties.artist if media_properties.artist else "Unknown Artist"
-            raw_album = media_properties.album_title
-
-            if title != self.current_track:
-                if media_properties.thumbnail:
-                    try:
-                        thumb_stream = await media_properties.thumbnail.open_read_async()
-                        size = thumb_stream.size
-                        buffer = Buffer(size)
-                        await thumb_stream.read_async(buffer, size, 0)
-                        
-                        with DataReader.from_buffer(buffer) as reader:
-                            byte_array = bytearray(size)
-                            reader.read_bytes(byte_array)
-                            self.cached_thumbnail = io.BytesIO(byte_array)
-                        
-                        thumb_stream.close()
-                    except:
-                        self.cached_thumbnail = None
-                else:
-                    self.cached_thumbnail = None
-                display_artist = raw_artist
-                display_album = raw_album
-
-                if " — " in raw_artist:
-                    parts = raw_artist.split(" — ", 1)
-                    display_artist = parts[0].strip()
-                    if not display_album: display_album = parts[1].strip()
-                elif " - " in raw_artist:
-                    parts = raw_artist.split(" - ", 1)
-                    display_artist = parts[0].strip()
-                    if not display_album: display_album = parts[1].strip()
-
-                self.current_track = title
-                self.current_artist = display_artist
-                self.current_album = display_album
-
-            if self.callback:
-                if self.cached_thumbnail: self.cached_thumbnail.seek(0)
-                self.callback(self.current_artist, self.current_track, self.current_album, is_playing_now, duration, current_pos, self.cached_thumbnail)
-        
-        self.last_position = current_pos
-        self.is_playing = is_playing_now
+            display_artist, display_album = self.split_artist(raw_artist, media_properties.album_title)
+            state.cached_thumbnail = await self.read_thumbnail(media_properties.thumbnail)
+            state.current_track = title
+            state.current_artist = display_artist
+            state.current_album = display_album
+            if duration <= 0:
+                state.elapsed = 0.0
+                current_pos = 0.0
+
+        state.dirty = False
+        state.reported = (current_pos, duration, is_playing_now, status)
+
+        if self.callback:
+            if state.cached_thumbnail: state.cached_thumbnail.seek(0)
+            self.callback(state.key, state.current_artist, state.current_track, state.current_album,
+                          is_playing_now, duration, current_pos, state.cached_thumbnail)
+
+    def split_artist(self, raw_artist, raw_album):
+        """Splits the "Artist — Album" strings Apple Music reports into separate fields."""
+        display_artist = raw_artist
+        display_album = raw_album
+
+        for separator in (" — ", " - "):
+            if separator in raw_artist:
+                parts = raw_artist.split(separator, 1)
+                display_artist = parts[0].strip()
+                if not display_album: display_album = parts[1].strip()
+                break
+
+        return display_artist, display_album
+
+    async def read_thumbnail(self, thumbnail):
+        if not thumbnail:
+            return None
+        try:
+            thumb_stream = await thumbnail.open_read_async()
+            size = thumb_stream.size
+            buffer = Buffer(size)
+            await thumb_stream.read_async(buffer, size, 0)
+
+            with DataReader.from_buffer(buffer) as reader:
+                byte_array = bytearray(size)
+                reader.read_bytes(byte_array)
+                cached = io.BytesIO(byte_array)
+
+            thumb_stream.close()
+            return cached
+        except:
+            return None
 
     async def run_loop(self):
         while True:
@@ -105,6 +280,6 @@ class MediaTracker:
                 await self.get_media_info()
                 sleep_time = 1.0 if self.is_playing else 3.0
                 await asyncio.sleep(sleep_time)
-                
+
             except Exception as e:
                 await asyncio.sleep(5)
\ No newline at end of file
@@ -0,0 +1,16 @@
+import os
+import sys
+import types
+
+# winsdk only exists on Windows; the tracker tests drive it with stub sessions instead.
+if "winsdk" not in sys.modules:
+    for name in ("winsdk", "winsdk.windows", "winsdk.windows.storage", "winsdk.windows.storage.streams",
+                 "winsdk.windows.media", "winsdk.windows.media.control"):
+        sys.modules[name] = types.ModuleType(name)
+    streams = sys.modules["winsdk.windows.storage.streams"]
+    streams.Buffer = streams.DataReader = None
+    control = sys.modules["winsdk.windows.media.control"]
+    control.GlobalSystemMediaTransportControlsSessionManager = None
+    control.GlobalSystemMediaTransportControlsSessionPlaybackStatus = types.SimpleNamespace(PLAYING=4, PAUSED=5)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
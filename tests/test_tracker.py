@@ -0,0 +1,232 @@
+import asyncio
+import types
+
+import tracker
+from tracker import MediaTracker, MISSING_TICKS
+
+PLAYING = 4
+PAUSED = 5
+
+
+class Seconds:
+    def __init__(self, value):
+        self.value = value
+
+    def total_seconds(self):
+        return self.value
+
+
+class FakeSession:
+    def __init__(self, app_id, title, duration=200, position=0, status=PLAYING):
+        self.source_app_user_model_id = app_id
+        self.title = title
+        self.duration = duration
+        self.position = position
+        self.status = status
+        self.handlers = {}
+        self.fetches = 0
+
+    def get_timeline_properties(self):
+        return types.SimpleNamespace(end_time=Seconds(self.duration), position=Seconds(self.position))
+
+    def get_playback_info(self):
+        return types.SimpleNamespace(playback_status=self.status)
+
+    async def try_get_media_properties_async(self):
+        self.fetches += 1
+        return types.SimpleNamespace(title=self.title, artist="Artist", album_title="Album", thumbnail=None)
+
+    def fire(self, event):
+        self.handlers[event](self, None)
+
+    def __getattr__(self, name):
+        if name.startswith("add_"):
+            return lambda handler: self.handlers.__setitem__(name[4:], handler) or name
+        if name.startswith("remove_"):
+            return lambda token: self.handlers.pop(name[7:], None)
+        raise AttributeError(name)
+
+
+class FakeWrapper:
+    """A fresh wrapper around the same session, as the manager returns on every fetch."""
+    def __init__(self, session):
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+class FakeManager:
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self.on_changed = None
+
+    def get_sessions(self):
+        return [FakeWrapper(session) for session in self.sessions]
+
+    def add_sessions_changed(self, handler):
+        self.on_changed = handler
+
+    def change(self, sessions):
+        self.sessions = sessions
+        self.on_changed(self, None)
+
+
+def make_tracker(sessions, allowed_apps=tracker.ALLOWED_APPS + tracker.BROWSER_APPS):
+    calls = []
+    media = MediaTracker(lambda *args: calls.append(args), allowed_apps=allowed_apps)
+    media.manager = FakeManager(sessions)
+    media.manager.add_sessions_changed(media.on_sessions_changed)
+    return media, calls
+
+
+def tick(media):
+    asyncio.run(media.get_media_info())
+
+
+def test_sessions_get_their_own_callbacks():
+    music = FakeSession("AppleInc.AppleMusicWin_nzyj5cx40ttqa!App", "Song A")
+    browser = FakeSession("Chrome", "Song B")
+    media, calls = make_tracker([music, browser])
+
+    tick(media)
+
+    assert [(c[0], c[2]) for c in calls] == [
+        ("AppleInc.AppleMusicWin_nzyj5cx40ttqa!App#0", "Song A"),
+        ("Chrome#1", "Song B"),
+    ]
+
+
+def test_unchanged_session_produces_no_callback():
+    music = FakeSession("AppleInc.AppleMusicWin_nzyj5cx40ttqa!App", "Song A", position=10, status=PAUSED)
+    media, calls = make_tracker([music])
+    tick(media)
+    for _ in range(3):
+        tick(media)
+    # The first tick reports; the paused transition after the still ticks reports once more.
+    assert len(calls) == 2
+    assert calls[-1][4] is False
+
+    calls.clear()
+    fetches = music.fetches
+    tick(media)
+    assert calls == []
+    assert music.fetches == fetches
+
+
+def test_sessions_sharing_an_app_id_stay_separate():
+    tab_a = FakeSession("Chrome", "Song A")
+    tab_b = FakeSession("Chrome", "Song B")
+    media, calls = make_tracker([tab_a, tab_b])
+    tick(media)
+
+    media.manager.change([tab_b])
+    for _ in range(MISSING_TICKS):
+        tab_b.position += 1
+        tick(media)
+
+    assert {(c[0], c[2]) for c in calls} == {("Chrome#0", "Song A"), ("Chrome#1", "Song B"), ("Chrome#0", None)}
+    assert list(media.sessions) == ["Chrome#1"]
+
+
+def test_key_and_state_survive_unrelated_session_changes():
+    music = FakeSession("AppleInc.AppleMusicWin_nzyj5cx40ttqa!App", "Song A")
+    other = FakeSession("Chrome", "Video")
+    media, calls = make_tracker([music])
+    tick(media)
+    state = media.sessions["AppleInc.AppleMusicWin_nzyj5cx40ttqa!App#0"]
+
+    for sessions in ([music, other], [music]):
+        media.manager.change(sessions)
+        for _ in range(MISSING_TICKS):
+            music.position += 1
+            tick(media)
+
+    music_calls = [c for c in calls if c[0].startswith("AppleInc")]
+    assert {c[0] for c in music_calls} == {"AppleInc.AppleMusicWin_nzyj5cx40ttqa!App#0"}
+    assert all(c[2] == "Song A" for c in music_calls)
+    assert media.sessions["AppleInc.AppleMusicWin_nzyj5cx40ttqa!App#0"] is state
+
+
+def test_events_follow_the_rebound_wrapper():
+    browser = FakeSession("Chrome", "Song A", duration=0, status=PAUSED)
+    media, calls = make_tracker([browser])
+    tick(media)
+    media.manager.change([browser, FakeSession("Spotify.exe", "Other")])
+    tick(media)
+    tick(media)
+    count = len(calls)
+
+    browser.title = "Song B"
+    browser.fire("media_properties_changed")
+    tick(media)
+
+    assert len(calls) == count + 1
+    assert calls[-1][:3] == ("Chrome#0", "Artist", "Song B")
+
+
+def test_title_change_with_static_timeline_is_reported():
+    browser = FakeSession("Chrome", "Song A", duration=0, status=PAUSED)
+    media, calls = make_tracker([browser])
+    tick(media)
+    tick(media)
+    assert len(calls) == 1
+
+    browser.title = "Song B"
+    browser.fire("media_properties_changed")
+    tick(media)
+
+    assert len(calls) == 2
+    assert calls[-1][2] == "Song B"
+
+
+def test_failed_fetch_is_retried():
+    music = FakeSession("AppleInc.AppleMusicWin_nzyj5cx40ttqa!App", None)
+    media, calls = make_tracker([music])
+    tick(media)
+    assert calls == []
+
+    music.title = "Song A"
+    tick(media)
+    assert calls[-1][2] == "Song A"
+
+
+def test_removal_is_debounced():
+    music = FakeSession("AppleInc.AppleMusicWin_nzyj5cx40ttqa!App", "Song A")
+    media, calls = make_tracker([music])
+    tick(media)
+
+    media.manager.change([])
+    for _ in range(MISSING_TICKS - 1):
+        tick(media)
+    assert all(c[2] is not None for c in calls)
+
+    tick(media)
+    assert calls[-1][2] is None
+    assert media.sessions == {}
+
+
+def test_failing_session_is_dropped_and_stops_counting_as_playing():
+    music = FakeSession("AppleInc.AppleMusicWin_nzyj5cx40ttqa!App", "Song A")
+    media, calls = make_tracker([music])
+    tick(media)
+    assert media.is_playing
+
+    def dead():
+        raise OSError("RPC server unavailable")
+    music.get_timeline_properties = dead
+    tick(media)
+    assert not media.is_playing
+    assert not media.is_session_playing("AppleInc.AppleMusicWin_nzyj5cx40ttqa!App#0")
+
+    for _ in range(MISSING_TICKS - 1):
+        tick(media)
+    assert calls[-1][2] is None
+    assert media.sessions == {}
+
+
+def test_browsers_are_opt_in():
+    browser = FakeSession("Chrome", "Song B")
+    media, calls = make_tracker([browser], allowed_apps=tracker.ALLOWED_APPS)
+    tick(media)
+    assert calls == []